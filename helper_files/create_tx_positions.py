@@ -35,10 +35,9 @@ def main():
     num_offsets = step_size
     z_height = args.z_height
 
-    all_positions = []
-    x_range = x_max - x_min
-    y_range = y_max - y_min
-    z_range = z_max - z_min
+    x_range = float(x_max - x_min)
+    y_range = float(y_max - y_min)
+    z_range = float(z_max - z_min)
 
     max_offsets_x = int(x_range / CELL_SIZE[0])
     max_offsets_y = int(y_range / CELL_SIZE[1])
@@ -46,19 +45,25 @@ def main():
 
     print(f"Maximum offsets: X={max_offsets_x}, Y={max_offsets_y}, Z={max_offsets_z}")
 
-    positions_file = f'rm_data/tx_positions_grid_{args.scene}_step{step_size}.csv'
+    positions_file = f'rm_data/tx_positions_grid_{args.scene}_step{step_size}.npy'
     os.makedirs('rm_data', exist_ok=True)
 
-    for offset in range(num_offsets):
-        x_centers = np.arange(x_min + offset, x_max, step_size)
-        y_centers = np.arange(y_min + offset, y_max, step_size)
-        X, Y = np.meshgrid(x_centers, y_centers)
-        positions = np.column_stack((X.flatten(), Y.flatten(), np.full(X.size, z_height)))
-        all_positions.append(positions)
-        print(f'Grid {offset}: Generated {len(positions)} positions with offset {offset}')
-
-    positions = np.vstack(all_positions)
-    np.savetxt(positions_file, positions, delimiter=',')
+    # Grid `offset` holds the points (x_min + offset + i*step_size, y_min + offset + j*step_size) inside the
+    # scene bounds. Build all grids at once: count the points per grid, then derive every point from its
+    # grid offset and its running index within that grid.
+    offsets = np.arange(num_offsets)
+    nx = np.maximum(np.ceil((x_range - offsets) / step_size), 0).astype(np.int64)
+    ny = np.maximum(np.ceil((y_range - offsets) / step_size), 0).astype(np.int64)
+    counts = nx * ny
+    grid_offset = np.repeat(offsets, counts)
+    local_idx = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    grid_nx = np.repeat(nx, counts)
+
+    positions = np.empty((counts.sum(), 3))
+    positions[:, 0] = float(x_min) + grid_offset + step_size * (local_idx % grid_nx)
+    positions[:, 1] = float(y_min) + grid_offset + step_size * (local_idx // grid_nx)
+    positions[:, 2] = z_height
+    np.save(positions_file, positions.astype(np.float32))
     print(f'\nTotal positions generated: {len(positions)}')
     print(f'Saved all positions to {positions_file}')
 
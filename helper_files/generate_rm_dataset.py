@@ -1,37 +1,47 @@
 import argparse
 import os
 import numpy as np
+import re
 import subprocess
+from read_rss import load_tx_positions, write_dir_bounds
 
 def main():
     parser = argparse.ArgumentParser(description="Generate RSS CSV files only for missing positions.")
-    parser.add_argument('--tx_positions_file', type=str, required=True, help='CSV file with transmitter positions (x,y,z per row)')
+    parser.add_argument('--tx_positions_file', type=str, required=True, help='.npy (or CSV) file with transmitter positions (x,y,z per row)')
     parser.add_argument('--dataset_dir', type=str, required=True, help='Directory where RSS files are/will be stored (e.g., ./rm_data/)')
     parser.add_argument('--scene', type=str, default='munich', help='Scene name (default: "munich")')
     parser.add_argument('--compress', action='store_true', help='Compress output files using gzip')
+    parser.add_argument('--npy', action='store_true', help='Store RSS grids as binary .npy files (.npz with --compress)')
+    parser.add_argument('--int16', action='store_true', help='Store RSS grids as int16 tenths of dB (implies --npy)')
     args = parser.parse_args()
 
     # Load all positions
-    positions = np.loadtxt(args.tx_positions_file, delimiter=',')
-    positions = np.atleast_2d(positions)
+    positions = load_tx_positions(args.tx_positions_file)
 
-    # List all existing files in dataset_dir
-    existing_files = set(os.listdir(args.dataset_dir))
-    remaining_positions = []
+    # Parse the coordinates of all existing files in dataset_dir once, as integer hundredths
+    # (the filenames encode coordinates with 2 decimals)
+    if args.npy or args.int16:
+        ext = 'npz' if args.compress else 'npy'
+    else:
+        ext = 'csv.gz' if args.compress else 'csv'
+    pattern = re.compile(rf"rss_{re.escape(args.scene)}_([\-\d.]+),([\-\d.]+),([\-\d.]+)\.{re.escape(ext)}$")
+    existing_keys = set()
+    for fname in os.listdir(args.dataset_dir):
+        m = pattern.match(fname)
+        if m:
+            existing_keys.add(tuple(round(float(v) * 100) for v in m.groups()))
 
-    for pos in positions:
-        x, y, z = pos
-        expected_file = f"rss_{args.scene}_{x:.2f},{y:.2f},{z:.2f}.csv.gz" if args.compress else f"rss_{args.scene}_{x:.2f},{y:.2f},{z:.2f}.csv"
-        if expected_file not in existing_files:
-            remaining_positions.append(pos)
+    keys = np.rint(positions * 100).astype(np.int64)
+    missing = np.array([key not in existing_keys for key in map(tuple, keys.tolist())], dtype=bool)
+    remaining_positions = positions[missing]
 
-    if not remaining_positions:
+    if len(remaining_positions) == 0:
         print("All positions already have RSS files. Nothing to do.")
         return
 
     print(f"{len(remaining_positions)} positions to process out of {len(positions)} total.")
-    temp_file = os.path.join(args.dataset_dir, 'remaining_tx_positions.csv')
-    np.savetxt(temp_file, remaining_positions, delimiter=',')
+    temp_file = os.path.join(args.dataset_dir, 'remaining_tx_positions.npy')
+    np.save(temp_file, remaining_positions.astype(np.float32))
 
     cmd = [
         'python', 'generate_rss_csv.py',
@@ -41,8 +51,17 @@ def main():
     ]
     if args.compress:
         cmd.append('--compress')
+    if args.npy:
+        cmd.append('--npy')
+    if args.int16:
+        cmd.append('--int16')
     print('Running command:', ' '.join(cmd))
     subprocess.run(cmd, check=True)
+    # Refresh the stored transmitter bounds used by the plots; the plots recompute them if this fails
+    try:
+        write_dir_bounds(args.dataset_dir, scene_name=args.scene)
+    except ValueError as e:
+        print(f"Warning: Could not update the transmitter bounds: {e}")
 
 if __name__ == '__main__':
     main()
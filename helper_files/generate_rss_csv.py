@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 # filepath: /home/neel/gpsharma/Capstone-Project-COVER/generate_rss_csv.py
 import argparse
+import io
 import os
+import shutil
+import subprocess
 import numpy as np
 from sionna.rt import load_scene, scene as rt_scene
-from coverage_helpers import rss_map_full, MAX_DEPTH, CELL_SIZE, SAMPLES_PER_TX
+from coverage_helpers import rss_map_full, rss_map_batch, MAX_DEPTH, CELL_SIZE, SAMPLES_PER_TX
 from scene_helpers import get_scene_bounds3d
-import pandas as pd
+from read_rss import load_tx_positions, quantize_rss, quantization_sidecar_path, RSS_DB_SCALE
+import json
 
-def rss_write_csv(scene_obj, tx_position, max_depth=MAX_DEPTH, cell_size=CELL_SIZE, samples_per_tx=SAMPLES_PER_TX, csv_file="rss_output.csv", compress=False):
+CSV_FLOAT_FORMAT = '%.6g'  # 6 significant digits per RSS value in CSV output
+
+def rss_write_csv(scene_obj, tx_position, max_depth=MAX_DEPTH, cell_size=CELL_SIZE, samples_per_tx=SAMPLES_PER_TX, csv_file="rss_output.csv", compress=False, binary=False, quantize=False, *, solver=None):
     """
-    Generates the RSS tensor using rss_map_full and writes it to a CSV file.
+    Generates the RSS tensor using rss_map_full and writes it to a CSV file,
+    or to a binary NumPy file when binary is set.
 
     Args:
         scene_obj: Sionna RT scene object.
@@ -20,34 +27,85 @@ def rss_write_csv(scene_obj, tx_position, max_depth=MAX_DEPTH, cell_size=CELL_SI
         samples_per_tx (int): Number of samples per transmitter.
         csv_file (str): Filename (with path) for the CSV output.
         compress (bool): Whether to compress the output using gzip.
+        binary (bool): Whether to store the float32 array as .npy (or compressed .npz if compress is set)
+            instead of CSV. The extension of csv_file is replaced accordingly.
+        quantize (bool): Whether to store the binary array as int16 tenths of dB (implies binary).
+        solver (RadioMapSolver): Pre-built solver reused across calls (default: the shared module-level solver).
         
     Returns:
         rss: The RSS tensor (as a numpy array).
     """
     # Generate the RSS using the existing function
     rss = rss_map_full(scene_obj, tx_position=tx_position, max_depth=max_depth,
-                       cell_size=cell_size, samples_per_tx=samples_per_tx, csv_file=None)
-    # Convert to numpy array if necessary
+                       cell_size=cell_size, samples_per_tx=samples_per_tx, csv_file=None, solver=solver)
+    # Convert to numpy array if necessary; no copy when it already is a float32 array
     if hasattr(rss, 'numpy'):
-        rss_array = rss.numpy()
-    else:
-        rss_array = np.array(rss)
+        rss = rss.numpy()
+    rss_array = np.asarray(rss, dtype=np.float32)
+
+    return write_rss_array(rss_array, csv_file, compress=compress, binary=binary, quantize=quantize)
+
+def write_rss_array(rss_array, csv_file, compress=False, binary=False, quantize=False):
+    """
+    Writes a single RSS grid to a CSV file, or to a binary NumPy file when binary is set.
+
+    Args:
+        rss_array (numpy.ndarray): RSS grid, e.g. of shape (603, 738) or (1, 603, 738).
+        csv_file (str): Filename (with path) for the CSV output.
+        compress (bool): Whether to compress the output using gzip.
+        binary (bool): Whether to store the float32 array as .npy (or compressed .npz if compress is set)
+            instead of CSV. The extension of csv_file is replaced accordingly.
+        quantize (bool): Whether to store the binary array as int16 tenths of dB (implies binary).
+            The scale and offset are recorded in a JSON sidecar next to the file.
 
+    Returns:
+        numpy.ndarray: The 2-D RSS array that was written.
+    """
     # Ensure the RSS array is 2-D before writing to CSV; for example, squeeze shape (1,603,738) to (603,738)
     if rss_array.ndim != 2:
         rss_array = np.squeeze(rss_array)
         if rss_array.ndim != 2:
             raise ValueError(f"After squeezing, RSS array must have 2 dimensions. Current shape: {rss_array.shape}")
 
-    # Write the RSS tensor to a CSV file
-    df = pd.DataFrame(rss_array)
+    if binary or quantize:
+        # Binary storage avoids text formatting/parsing of the dense grid entirely
+        rss_array = rss_array.astype(np.float32, copy=False)
+        stored_array = quantize_rss(rss_array) if quantize else rss_array
+        base = csv_file[:-len('.gz')] if csv_file.endswith('.gz') else csv_file
+        base = base[:-len('.csv')] if base.endswith('.csv') else base
+        out_file = base + ('.npz' if compress else '.npy')
+        if compress:
+            np.savez_compressed(out_file, rss=stored_array)
+        else:
+            np.save(out_file, stored_array)
+        sidecar = quantization_sidecar_path(out_file)
+        if quantize:
+            with open(sidecar, 'w') as f:
+                json.dump({'scale': RSS_DB_SCALE, 'offset': 0.0}, f)
+        elif os.path.exists(sidecar):
+            # Drop the sidecar of an earlier quantized write of this position
+            os.remove(sidecar)
+        return rss_array
+
+    # Write the RSS tensor to a CSV file; np.savetxt formats the dense grid directly, without a DataFrame
     if compress:
         # Add .gz extension if not already present
         if not csv_file.endswith('.gz'):
             csv_file = csv_file + '.gz'
-        df.to_csv(csv_file, index=False, header=False, compression='gzip')
+        pigz = shutil.which('pigz')
+        if pigz:
+            # Parallel gzip: spread DEFLATE of the grid over all cores
+            with open(csv_file, 'wb') as out, \
+                    subprocess.Popen([pigz, '-p', str(os.cpu_count()), '-c'], stdin=subprocess.PIPE, stdout=out) as proc:
+                with io.TextIOWrapper(proc.stdin, newline='') as stdin:
+                    np.savetxt(stdin, rss_array, delimiter=',', fmt=CSV_FLOAT_FORMAT)
+            if proc.returncode != 0:
+                raise RuntimeError(f"pigz failed with exit code {proc.returncode} while writing {csv_file}")
+        else:
+            # np.savetxt gzips files ending in .gz
+            np.savetxt(csv_file, rss_array, delimiter=',', fmt=CSV_FLOAT_FORMAT)
     else:
-        df.to_csv(csv_file, index=False, header=False)
+        np.savetxt(csv_file, rss_array, delimiter=',', fmt=CSV_FLOAT_FORMAT)
     
     return rss_array
 
@@ -56,13 +114,24 @@ def main():
     parser.add_argument("--scene", type=str, required=True,
                         help="Scene name string, e.g., 'munich' (assumes attribute in sionna.rt.scene)")
     parser.add_argument("--tx_positions_file", type=str, default="",
-                        help="Path to CSV file containing tx positions (one per line as x,y,z). Ignored if --N > 0.")
+                        help="Path to .npy (or CSV) file containing tx positions (one per line as x,y,z). Ignored if --N > 0.")
     parser.add_argument("--N", type=int, default=0,
                         help="Number of random transmitter positions to generate. If >0, overrides tx_positions_file.")
     parser.add_argument("--out_dir", type=str, default=".",
                         help="Output directory where the RSS CSV files will be stored")
     parser.add_argument("--compress", action="store_true",
                         help="Compress output files using gzip")
+    parser.add_argument("--max_rays", type=int, default=SAMPLES_PER_TX,
+                        help="Ray budget of one radio map computation; the batch size is max_rays // samples per transmitter. "
+                             "Larger batches share the ray tracing setup between transmitters, but the solver memory grows "
+                             "with the number of rays (default: one transmitter per computation)")
+    parser.add_argument("--batch_size", type=int, default=0,
+                        help="Number of transmitter positions solved together in one radio map computation, "
+                             "overriding --max_rays (default: derived from --max_rays)")
+    parser.add_argument("--npy", action="store_true",
+                        help="Store RSS grids as binary .npy files (.npz with --compress) instead of CSV")
+    parser.add_argument("--int16", action="store_true",
+                        help="Store RSS grids as int16 tenths of dB in .npy files (implies --npy)")
     args = parser.parse_args()
 
     # Create the output directory if it does not exist
@@ -90,28 +159,27 @@ def main():
     else:
         if not args.tx_positions_file:
             raise ValueError("Either provide --tx_positions_file or set --N > 0 to generate random positions.")
-        try:
-            # Use np.loadtxt assuming the file has rows of 3 numbers
-            tx_positions = np.loadtxt(args.tx_positions_file, delimiter=',')
-        except Exception:
-            # Fall back to whitespace delimiter in case csv isn't comma separated.
-            tx_positions = np.loadtxt(args.tx_positions_file)
-        # Ensure tx_positions is always 2D
-        tx_positions = np.atleast_2d(tx_positions)
+        # .npy positions file, or a text file with rows of 3 numbers
+        tx_positions = load_tx_positions(args.tx_positions_file)
         print(f"Loaded {tx_positions.shape[0]} tx positions from {args.tx_positions_file}")
 
     num_positions = tx_positions.shape[0]
 
-    # Process each tx_position and generate a corresponding csv file.
-    for i, pos in enumerate(tx_positions):
-        # Format the tx position as a comma-separated string with 2 decimals.
-        tx_str = ",".join(f"{val:.2f}" for val in pos)
-        csv_name = f"rss_{args.scene}_{tx_str}.csv"
-        csv_path = os.path.join(args.out_dir, csv_name)
-        
-        # Generate the RSS CSV file for the current tx position.
-        rss_array = rss_write_csv(scene_obj, tx_position=pos, csv_file=csv_path, compress=args.compress)
-        print(f"[{i+1}/{num_positions}] RSS data for tx_position {tx_str} saved to {csv_path}")
+    # Solve the tx_positions in batches and generate a corresponding csv file for each position.
+    batch_size = max(1, args.batch_size or args.max_rays // SAMPLES_PER_TX)
+    for start in range(0, num_positions, batch_size):
+        batch = tx_positions[start:start + batch_size]
+        # Uses the solver shared through coverage_helpers for all batches
+        rss_maps = rss_map_batch(scene_obj, batch)
+        for i, (pos, rss_array) in enumerate(zip(batch, rss_maps), start):
+            # Format the tx position as a comma-separated string with 2 decimals.
+            tx_str = ",".join(f"{val:.2f}" for val in pos)
+            csv_name = f"rss_{args.scene}_{tx_str}.csv"
+            csv_path = os.path.join(args.out_dir, csv_name)
+
+            # Write the RSS CSV file for the current tx position.
+            write_rss_array(rss_array, csv_file=csv_path, compress=args.compress, binary=args.npy, quantize=args.int16)
+            print(f"[{i+1}/{num_positions}] RSS data for tx_position {tx_str} saved to {csv_path}")
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -1,13 +1,124 @@
 #!/usr/bin/env python3
 import argparse
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 from mpl_toolkits.mplot3d import Axes3D
-from scipy.interpolate import griddata
+from scipy.interpolate import CloughTocher2DInterpolator
+from scipy.spatial import Delaunay
 import os
-from coverage_helpers import compute_coverage_from_arr
-from rate_helpers import compute_rate_from_arr
+from functools import lru_cache, partial
+# rss_metrics instead of coverage_helpers/rate_helpers: the spawned pool workers import this module,
+# and should not have to load TensorFlow and Sionna
+from rss_metrics import compute_coverage_from_arr, compute_coverage_from_csv_cuda, compute_rate_from_arr, compute_rate_from_csv, compute_rate_from_csv_cuda, load_and_score, process_pool, _safe_call
+from read_rss import gpu_available, iter_rss_files, load_rss_array, load_rss_stack, stack_coords_path, read_dir_bounds
+
+_RSS_SUFFIXES = ('.csv.gz', '.csv', '.npy', '.npz')
+# Maximum number of rows/columns drawn by plot_surface for an RSS map
+_SURFACE_TARGET = 200
+# Number of grids read from an RSS stack at once
+_STACK_BATCH = 32
+
+def _parse_coords(fname, prefix='rss_munich_'):
+    """
+    Extracts the transmitter coordinates from an RSS file name such as rss_munich_625.42,-457.60,20.00.csv.gz.
+    
+    Args:
+        fname (str): File name (without directory)
+        prefix (str): File name prefix preceding the coordinates
+        
+    Returns:
+        tuple: (tx_x, tx_y, tx_z)
+    """
+    s = fname[len(prefix):]
+    for suffix in _RSS_SUFFIXES:
+        if s.endswith(suffix):
+            s = s[:-len(suffix)]
+            break
+    a, b, c = s.split(',')
+    return float(a), float(b), float(c)
+
+def _dir_bounds(dir_path, scene_name="munich"):
+    """
+    Returns (x_min, x_max, y_min, y_max) of the transmitter positions in dir_path, read from the
+    stored bounds file of the directory instead of listing and parsing every RSS file name.
+    """
+    # Keyed on the directory mtime so that adding or removing files invalidates the cached bounds
+    return _cached_dir_bounds(dir_path, scene_name, os.stat(dir_path).st_mtime)
+
+@lru_cache(maxsize=None)
+def _cached_dir_bounds(dir_path, scene_name, mtime):
+    bounds = read_dir_bounds(dir_path, scene_name=scene_name)
+    return bounds['x_min'], bounds['x_max'], bounds['y_min'], bounds['y_max']
+
+class RSSPlotter:
+    """
+    Keeps the figure, axes and surface of an RSS map so that the map can be redrawn with another
+    RSS grid or scale factor (e.g. sweeps over --scale) without rebuilding the Matplotlib objects.
+    
+    Args:
+        rss (numpy.ndarray): 2D array of RSS values
+        x_min, x_max, y_min, y_max (float): Coordinate range covered by the grid
+        scale_factor (float): Factor to scale the Z-axis (RSS values)
+    """
+    def __init__(self, rss, x_min, x_max, y_min, y_max, scale_factor=1.0):
+        self.shape = rss.shape
+        # Downsample to at most ~200x200 quads, matplotlib builds every polygon in Python
+        self._sx = max(1, rss.shape[1] // _SURFACE_TARGET)
+        self._sy = max(1, rss.shape[0] // _SURFACE_TARGET)
+        
+        # Create the coordinate meshgrid, with cell i starting at min + i * (max - min) / n,
+        # as broadcast views of the two axes instead of two full index arrays
+        x_axis = np.linspace(x_min, x_max, rss.shape[1], endpoint=False)[::self._sx]
+        y_axis = np.linspace(y_min, y_max, rss.shape[0], endpoint=False)[::self._sy]
+        self._x, self._y = np.meshgrid(x_axis, y_axis, copy=False, indexing='xy')
+        
+        self.fig = plt.figure(figsize=(12, 8))
+        self.ax = self.fig.add_subplot(111, projection='3d')
+        
+        # Set axis limits based on the complete range plus a small margin
+        margin = 0.05  # 5% margin
+        x_margin = (x_max - x_min) * margin
+        y_margin = (y_max - y_min) * margin
+        self.ax.set_xlim(x_min - x_margin, x_max + x_margin)
+        self.ax.set_ylim(y_min - y_margin, y_max + y_margin)
+        
+        # Create the surface plot with improved settings
+        z = self._normalize(rss, scale_factor)
+        self.surf = self.ax.plot_surface(self._x, self._y, z, cmap='viridis',
+                                         rstride=1, cstride=1, linewidth=0, antialiased=False, alpha=0.9,
+                                         edgecolor='none', shade=True)
+    
+    def _normalize(self, rss, scale_factor):
+        """
+        Log normalizes the RSS values and returns the downsampled surface heights.
+        """
+        # log10(rss - min + 1), in float64: linear RSS values are far below the float32 epsilon,
+        # so 1 + x would round to 1 and flatten the surface. Only the result is stored as float32
+        rss_shifted = np.asarray(rss, dtype=np.float64) - np.min(rss)
+        self.rss_normalized = (np.log1p(rss_shifted) * (scale_factor / np.log(10))).astype(np.float32)
+        return self.rss_normalized[::self._sy, ::self._sx]
+    
+    def update(self, rss, scale_factor=1.0):
+        """
+        Redraws the surface with new RSS values and/or scale factor by replacing the vertices and
+        colors of the existing surface.
+        
+        Args:
+            rss (numpy.ndarray): 2D array of RSS values, with the same shape as the initial grid
+            scale_factor (float): Factor to scale the Z-axis (RSS values)
+        """
+        if rss.shape != self.shape:
+            raise ValueError(f"RSS grid has shape {rss.shape}, expected {self.shape}.")
+        z = self._normalize(rss, scale_factor)
+        # One quad per grid cell, corners in the same order as plot_surface with rstride=cstride=1
+        xyz = np.stack(np.broadcast_arrays(self._x, self._y, z), axis=-1)
+        verts = np.stack([xyz[:-1, :-1], xyz[:-1, 1:], xyz[1:, 1:], xyz[1:, :-1]], axis=2).reshape(-1, 4, 3)
+        avg_z = verts[:, :, 2].mean(axis=1)
+        self.surf.set_verts(verts)
+        self.surf.set_array(avg_z)
+        self.surf.set_clim(avg_z.min(), avg_z.max())
+        self.ax.set_zlim(z.min(), z.max())
+        self.fig.canvas.draw_idle()
 
 def plot_rss_3d(csv_file, scale_factor=1.0, min_rss=None, max_rss=None, output_file=None):
     """
@@ -20,51 +131,16 @@ def plot_rss_3d(csv_file, scale_factor=1.0, min_rss=None, max_rss=None, output_f
         max_rss (float): Maximum RSS value for normalization (optional)
         output_file (str): Path to save the plot image (optional)
     """
-    # Read the CSV file
-    # If it's gzipped, pandas will automatically handle it
-    rss = pd.read_csv(csv_file, header=None).values
-    
-    # Find all RSS files to determine coordinate ranges
-    dir_path = os.path.dirname(csv_file)
-    all_files = [f for f in os.listdir(dir_path) if f.startswith('rss_munich_') and (f.endswith('.csv') or f.endswith('.csv.gz'))]
-    
-    # Extract all coordinates
-    x_coords, y_coords = [], []
-    for f in all_files:
-        try:
-            coords = f.replace('rss_munich_', '').replace('.csv.gz', '').replace('.csv', '')
-            x, y, _ = map(float, coords.split(','))
-            x_coords.append(x)
-            y_coords.append(y)
-        except:
-            continue
-    
-    # Determine coordinate ranges
-    x_min, x_max = min(x_coords), max(x_coords)
-    y_min, y_max = min(y_coords), max(y_coords)
-    
-    # Create coordinate meshgrid
-    y, x = np.mgrid[0:rss.shape[0], 0:rss.shape[1]]
-    
-    # Scale coordinates to match actual dimensions
-    # Calculate scaling factors to match actual dimensions
-    x_scale = (x_max - x_min) / rss.shape[1]
-    y_scale = (y_max - y_min) / rss.shape[0]
+    # Read the CSV file (gzipped and binary .npy files are handled as well)
+    rss = load_rss_array(csv_file)
     
-    # Scale coordinates to match actual dimensions
-    x = x_min + x * x_scale
-    y = y_min + y * y_scale
+    # Determine coordinate ranges from the transmitter positions of the dataset
+    x_min, x_max, y_min, y_max = _dir_bounds(os.path.dirname(csv_file) or '.')
     
     # Create 3D plot
-    fig = plt.figure(figsize=(12, 8))
-    ax = fig.add_subplot(111, projection='3d')
-    
-    # Set axis limits based on the complete range plus a small margin
-    margin = 0.05  # 5% margin
-    x_margin = (x_max - x_min) * margin
-    y_margin = (y_max - y_min) * margin
-    ax.set_xlim(x_min - x_margin, x_max + x_margin)
-    ax.set_ylim(y_min - y_margin, y_max + y_margin)
+    plotter = RSSPlotter(rss, x_min, x_max, y_min, y_max, scale_factor=scale_factor)
+    fig, ax, surf = plotter.fig, plotter.ax, plotter.surf
+    rss_normalized = plotter.rss_normalized
     
     # Scale RSS values
     if min_rss is None:
@@ -72,15 +148,6 @@ def plot_rss_3d(csv_file, scale_factor=1.0, min_rss=None, max_rss=None, output_f
     if max_rss is None:
         max_rss = np.max(rss)
     
-    # Log normalize the RSS values
-    rss_positive = rss - np.min(rss) + 1  # Make all values positive and non-zero
-    rss_normalized = np.log10(rss_positive) * scale_factor
-    
-    # Create the surface plot with improved settings
-    surf = ax.plot_surface(x, y, rss_normalized, cmap='viridis',
-                          linewidth=0.5, antialiased=True, alpha=0.9,
-                          edgecolor='k', shade=True)
-    
     # Add a color bar with better formatting
     cbar = fig.colorbar(surf, ax=ax, shrink=0.5, aspect=5,
                        label=f'RSS (dB, normalized, scale={scale_factor})',
@@ -90,8 +157,7 @@ def plot_rss_3d(csv_file, scale_factor=1.0, min_rss=None, max_rss=None, output_f
     filename = os.path.basename(csv_file)
     try:
         if filename.startswith('rss_munich_'):
-            coords = filename.replace('rss_munich_', '').replace('.csv.gz', '').replace('.csv', '')
-            tx_x, tx_y, tx_z = map(float, coords.split(','))
+            tx_x, tx_y, tx_z = _parse_coords(filename)
             # Plot transmitter position
             # Add small vertical offset to ensure transmitter point is visible above surface
             z_offset = (np.max(rss_normalized) - np.min(rss_normalized)) * 0.05
@@ -144,11 +210,74 @@ def plot_rss_3d(csv_file, scale_factor=1.0, min_rss=None, max_rss=None, output_f
     
     plt.show()
 
+@lru_cache(maxsize=8)
+def _delaunay(points_bytes, num_points):
+    """
+    Triangulates the transmitter positions, cached on their raw bytes so that re-plotting the same
+    positions (e.g. coverage and rate of one dataset) reuses the triangulation.
+    """
+    return Delaunay(np.frombuffer(points_bytes, dtype=np.float64).reshape(num_points, 2))
+
+def _interpolate_grid(points, values, grid_x, grid_y):
+    """
+    Cubic (Clough-Tocher) interpolation of scattered transmitter values onto a regular grid.
+    Equivalent to griddata(..., method='cubic', fill_value=min(values)) but with a cached triangulation.
+    
+    Args:
+        points (numpy.ndarray): (N, 2) transmitter x, y positions
+        values (numpy.ndarray): (N,) values at the transmitter positions
+        grid_x (numpy.ndarray): X coordinates of the output grid
+        grid_y (numpy.ndarray): Y coordinates of the output grid
+        
+    Returns:
+        numpy.ndarray: Interpolated values with the shape of grid_x.
+    """
+    points = np.ascontiguousarray(points, dtype=np.float64)
+    tri = _delaunay(points.tobytes(), len(points))
+    interp = CloughTocher2DInterpolator(tri, values, fill_value=np.min(values))
+    return interp(grid_x, grid_y)
+
+def _map_points(fn, gpu_fn, file_paths):
+    """
+    Yields _safe_call results of fn for file_paths in order. With a CUDA device the files are processed
+    one after the other on the GPU in this process with gpu_fn, otherwise in a process pool on the CPU.
+    """
+    if gpu_available():
+        yield from map(partial(_safe_call, gpu_fn), file_paths)
+        return
+    with process_pool() as executor:
+        yield from executor.map(partial(_safe_call, fn), file_paths, chunksize=16)
+
+def _directory_points(dir_path, fn, gpu_fn):
+    """
+    Computes one value per transmitter position for the directory mode of plot_coverage_3d/plot_rate_3d.
+    Files that cannot be processed are reported and skipped.
+    Returns:
+        tuple: (tx_positions, values) with tx_positions of shape (N, 2)
+    """
+    files = list(iter_rss_files(dir_path))
+    total_files = len(files)
+    tx_positions = np.array([coord[:2] for _, coord in files], dtype=np.float32).reshape(total_files, 2)
+    values = np.empty(total_files, dtype=np.float32)
+    valid = np.zeros(total_files, dtype=bool)
+    print(f"Found {total_files} RSS files to process")
+    results = _map_points(fn, gpu_fn, [file_path for file_path, _ in files])
+    for idx, ((file_path, _), (value, error)) in enumerate(zip(files, results)):
+        filename = os.path.basename(file_path)
+        print(f"\rProcessing file {idx + 1}/{total_files} ({filename})", end="", flush=True)
+        if error is not None:
+            print(f"\nError processing {filename}: {error}")
+            continue
+        values[idx] = value
+        valid[idx] = True
+    print("\nAll files processed successfully!")
+    return tx_positions[valid], values[valid]
+
 def plot_coverage_3d(data_or_csv, output_file=None):
     """
-    Plot a 3D coverage map from either a directory of RSS files or a coverage summary CSV file.
+    Plot a 3D coverage map from a directory of RSS files, an RSS stack written by read_rss.build_rss_stack, or a coverage summary CSV file.
     Args:
-        data_or_csv (str): Directory containing RSS files (for raw computation) or path to coverage summary CSV file.
+        data_or_csv (str): Directory containing RSS files or path to an RSS stack .npy (for raw computation), or path to coverage summary CSV file.
         output_file (str): Path to save the plot image (optional)
     """
     import os
@@ -156,33 +285,20 @@ def plot_coverage_3d(data_or_csv, output_file=None):
     import numpy as np
     import matplotlib.pyplot as plt
     from mpl_toolkits.mplot3d import Axes3D
-    from scipy.interpolate import griddata
 
     if os.path.isdir(data_or_csv):
         # Directory mode: compute coverage from RSS files
-        all_files = [f for f in os.listdir(data_or_csv) if f.startswith('rss_munich_') and f.endswith('.csv.gz')]
-        tx_positions = []
-        coverage_values = []
-        total_files = len(all_files)
-        print(f"Found {total_files} RSS files to process")
-        for idx, filename in enumerate(all_files, 1):
-            print(f"\rProcessing file {idx}/{total_files} ({filename})", end="", flush=True)
-            try:
-                coords = filename.replace('rss_munich_', '').replace('.csv.gz', '')
-                tx_x, tx_y, tx_z = map(float, coords.split(','))
-                file_path = os.path.join(data_or_csv, filename)
-                rss_array = pd.read_csv(file_path, header=None).values
-                from coverage_helpers import compute_coverage_from_arr
-                coverage = compute_coverage_from_arr(rss_array)
-                tx_positions.append([tx_x, tx_y])
-                coverage_values.append(coverage)
-            except Exception as e:
-                print(f"\nError processing {filename}: {e}")
-                continue
-        print("\nAll files processed successfully!")
+        tx_positions, coverage_values = _directory_points(data_or_csv, load_and_score, compute_coverage_from_csv_cuda)
+        print(f"Generated coverage data for {len(tx_positions)} transmitter positions")
+    elif os.path.exists(stack_coords_path(data_or_csv)):
+        # Stack mode: RSS grids consolidated with read_rss.build_rss_stack
+        stack, coords = load_rss_stack(data_or_csv)
+        tx_positions = coords[:, :2]
+        coverage_values = np.empty(len(stack))
+        for start in range(0, len(stack), _STACK_BATCH):
+            for idx, rss_array in enumerate(np.asarray(stack[start:start + _STACK_BATCH]), start):
+                coverage_values[idx] = compute_coverage_from_arr(rss_array)
         print(f"Generated coverage data for {len(tx_positions)} transmitter positions")
-        tx_positions = np.array(tx_positions)
-        coverage_values = np.array(coverage_values)
     else:
         # CSV mode: load coverage summary
         df = pd.read_csv(data_or_csv)
@@ -201,14 +317,8 @@ def plot_coverage_3d(data_or_csv, output_file=None):
         x_min - x_margin: x_max + x_margin: 100j,
         y_min - y_margin: y_max + y_margin: 100j
     ]
-    grid_z = griddata(
-        points=tx_positions,
-        values=coverage_values,
-        xi=(grid_x, grid_y),
-        method='cubic',
-        fill_value=np.min(coverage_values)
-    )
-    surf = ax.plot_surface(grid_x, grid_y, grid_z, cmap='viridis', linewidth=0.5, antialiased=True, alpha=1.0, edgecolor='k')
+    grid_z = _interpolate_grid(tx_positions, coverage_values, grid_x, grid_y)
+    surf = ax.plot_surface(grid_x, grid_y, grid_z, cmap='viridis', rstride=1, cstride=1, linewidth=0, antialiased=False, alpha=1.0, edgecolor='none')
     cbar = fig.colorbar(surf, ax=ax, shrink=0.5, aspect=5, label='Coverage', format='%.2e')
     ax.set_xlabel('X coordinate (meters)')
     ax.set_ylabel('Y coordinate (meters)')
@@ -224,9 +334,9 @@ def plot_coverage_3d(data_or_csv, output_file=None):
 
 def plot_rate_3d(data_or_csv, output_file=None):
     """
-    Plot a 3D rate map from either a directory of RSS files or a rate summary CSV file.
+    Plot a 3D rate map from a directory of RSS files, an RSS stack written by read_rss.build_rss_stack, or a rate summary CSV file.
     Args:
-        data_or_csv (str): Directory containing RSS files (for raw computation) or path to rate summary CSV file.
+        data_or_csv (str): Directory containing RSS files or path to an RSS stack .npy (for raw computation), or path to rate summary CSV file.
         output_file (str): Path to save the plot image (optional)
     """
     import os
@@ -234,32 +344,20 @@ def plot_rate_3d(data_or_csv, output_file=None):
     import numpy as np
     import matplotlib.pyplot as plt
     from mpl_toolkits.mplot3d import Axes3D
-    from scipy.interpolate import griddata
 
     if os.path.isdir(data_or_csv):
         # Directory mode: compute rate from RSS files
-        from rate_helpers import compute_rate_from_csv
-        all_files = [f for f in os.listdir(data_or_csv) if f.startswith('rss_munich_') and (f.endswith('.csv') or f.endswith('.csv.gz'))]
-        tx_positions = []
-        rate_values = []
-        total_files = len(all_files)
-        print(f"Found {total_files} RSS files to process")
-        for idx, filename in enumerate(all_files, 1):
-            print(f"\rProcessing file {idx}/{total_files} ({filename})", end="", flush=True)
-            try:
-                coords = filename.replace('rss_munich_', '').replace('.csv.gz', '').replace('.csv', '')
-                tx_x, tx_y, tx_z = map(float, coords.split(','))
-                file_path = os.path.join(data_or_csv, filename)
-                rate = compute_rate_from_csv(file_path)
-                tx_positions.append([tx_x, tx_y])
-                rate_values.append(rate)
-            except Exception as e:
-                print(f"\nError processing {filename}: {e}")
-                continue
-        print("\nAll files processed successfully!")
+        tx_positions, rate_values = _directory_points(data_or_csv, compute_rate_from_csv, compute_rate_from_csv_cuda)
+        print(f"Generated rate data for {len(tx_positions)} transmitter positions")
+    elif os.path.exists(stack_coords_path(data_or_csv)):
+        # Stack mode: RSS grids consolidated with read_rss.build_rss_stack
+        stack, coords = load_rss_stack(data_or_csv)
+        tx_positions = coords[:, :2]
+        rate_values = np.empty(len(stack))
+        for start in range(0, len(stack), _STACK_BATCH):
+            for idx, rss_array in enumerate(np.asarray(stack[start:start + _STACK_BATCH]), start):
+                rate_values[idx] = compute_rate_from_arr(rss_array)
         print(f"Generated rate data for {len(tx_positions)} transmitter positions")
-        tx_positions = np.array(tx_positions)
-        rate_values = np.array(rate_values)
     else:
         # CSV mode: load rate summary
         df = pd.read_csv(data_or_csv)
@@ -278,14 +376,8 @@ def plot_rate_3d(data_or_csv, output_file=None):
         x_min - x_margin: x_max + x_margin: 100j,
         y_min - y_margin: y_max + y_margin: 100j
     ]
-    grid_z = griddata(
-        points=tx_positions,
-        values=rate_values,
-        xi=(grid_x, grid_y),
-        method='cubic',
-        fill_value=np.min(rate_values)
-    )
-    surf = ax.plot_surface(grid_x, grid_y, grid_z, cmap='plasma', linewidth=0.5, antialiased=True, alpha=1.0, edgecolor='k')
+    grid_z = _interpolate_grid(tx_positions, rate_values, grid_x, grid_y)
+    surf = ax.plot_surface(grid_x, grid_y, grid_z, cmap='plasma', rstride=1, cstride=1, linewidth=0, antialiased=False, alpha=1.0, edgecolor='none')
     cbar = fig.colorbar(surf, ax=ax, shrink=0.5, aspect=5, label='Rate (bits/s/Hz)', format='%.2e')
     ax.set_xlabel('X coordinate (meters)')
     ax.set_ylabel('Y coordinate (meters)')
@@ -317,12 +409,12 @@ def main():
     
     # Parser for coverage map plotting (directory or summary CSV)
     coverage_parser = subparsers.add_parser('coverage', help='Plot 3D coverage map from RSS directory or coverage summary CSV')
-    coverage_parser.add_argument('data_or_csv', help='Path to directory with RSS files or coverage summary CSV file')
+    coverage_parser.add_argument('data_or_csv', help='Path to directory with RSS files, RSS stack .npy, or coverage summary CSV file')
     coverage_parser.add_argument('--output', type=str, default=None, help='Path to save the plot image (e.g., coverage_plot.png)')
 
     # Parser for rate map plotting (directory or summary CSV)
     rate_parser = subparsers.add_parser('rate', help='Plot 3D rate map from RSS directory or rate summary CSV')
-    rate_parser.add_argument('data_or_csv', help='Path to directory with RSS files or rate summary CSV file')
+    rate_parser.add_argument('data_or_csv', help='Path to directory with RSS files, RSS stack .npy, or rate summary CSV file')
     rate_parser.add_argument('--output', type=str, default=None, help='Path to save the plot image (e.g., rate_plot.png)')
     
     args = parser.parse_args()
@@ -1,38 +1,8 @@
 import numpy as np
-import pandas as pd
 import os
-import re
 from scene_helpers import grid_indices_to_center_coordinate
-
-NOISE_POWER = 1e-10  # Example: -100 dBm ≈ 1e-10 W (set as needed)
-
-def compute_rate_from_arr(rss_array, noise_power=NOISE_POWER):
-    """
-    Compute average rate from RSS array using Shannon capacity formula.
-    Args:
-        rss_array (numpy.ndarray): 2D array of RSS values in absolute (linear) scale (Watts)
-        noise_power (float): Noise power in Watts
-    Returns:
-        float: Average rate (bits/s/Hz) over the grid
-    """
-    with np.errstate(divide='ignore'):
-        snr = rss_array / noise_power
-        rate = np.log2(1 + snr)
-    avg_rate = np.mean(rate)
-    return avg_rate
-
-def compute_rate_from_csv(csv_file, noise_power=NOISE_POWER):
-    """
-    Computes the average rate from a CSV file containing RSS data.
-    Args:
-        csv_file (str): Path to the CSV file.
-        noise_power (float): Noise power in Watts
-    Returns:
-        float: Average rate (bits/s/Hz)
-    """
-    df = pd.read_csv(csv_file, header=None)
-    rss_array = df.values
-    return compute_rate_from_arr(rss_array, noise_power=noise_power)
+from read_rss import parse_tx_coord, iter_rss_files, find_closest_rss_file, find_closest_rss_files_batch, load_rss_array
+from rss_metrics import NOISE_POWER, compute_rate_from_arr, compute_rate_from_csv, process_pool, _safe_call
 
 def compute_rate_from_csv_gz(file_path, noise_power=NOISE_POWER, scene_name="munich"):
     """
@@ -44,81 +14,73 @@ def compute_rate_from_csv_gz(file_path, noise_power=NOISE_POWER, scene_name="mun
     Returns:
         tuple: (tx_x, tx_y, tx_z, avg_rate)
     """
-    filename = os.path.basename(file_path)
-    m = re.match(r"rss_" + re.escape(scene_name) + r"_([\-\d.]+),([\-\d.]+),([\-\d.]+)\.csv\.gz", filename)
-    if not m:
-        raise ValueError(f"Filename {filename} does not match expected pattern for scene '{scene_name}'.")
-    tx_x, tx_y, tx_z = map(float, m.groups())
-    rss_array = pd.read_csv(file_path, header=None).values
+    tx_x, tx_y, tx_z = parse_tx_coord(file_path, scene_name=scene_name)
+    rss_array = load_rss_array(file_path)
     avg_rate = compute_rate_from_arr(rss_array, noise_power=noise_power)
     return tx_x, tx_y, tx_z, avg_rate
 
-def compute_rate_for_directory_to_csv(dir_path, output_csv, noise_power=NOISE_POWER, scene_name="munich"):
+def compute_rate_for_directory_to_csv(dir_path, output_csv, noise_power=NOISE_POWER, scene_name="munich", num_workers=None):
     """
-    For all rss_<scene_name>_*.csv.gz files in the directory, compute average rate and write to a CSV file.
+    For all rss_<scene_name>_* files in the directory, compute average rate and write to a CSV file.
     Each line in the output CSV will be: x, y, z, avg_rate
+    Files are processed in parallel with a process pool, and each row is written as soon as it is computed,
+    so memory use does not grow with the number of files and the output can be inspected while it runs.
     Args:
-        dir_path (str): Directory containing rss_<scene_name>_*.csv.gz files
+        dir_path (str): Directory containing rss_<scene_name>_* files
         output_csv (str): Path to output CSV file
         noise_power (float): Noise power in Watts
         scene_name (str): Scene name (default: "munich")
+        num_workers (int): Number of worker processes (default: os.cpu_count())
     """
-    import glob
-    results = []
-    pattern = os.path.join(dir_path, f'rss_{scene_name}_*.csv.gz')
-    files = glob.glob(pattern)
+    import csv
+    from functools import partial
+    # File names are parsed once here; the workers only load and reduce the grids
+    files, coords = [], []
+    for file_path, coord in iter_rss_files(dir_path, scene_name):
+        files.append(file_path)
+        coords.append(coord)
     total = len(files)
+    written = 0
     print(f"Found {total} files to process.")
-    for idx, file_path in enumerate(files, 1):
-        try:
-            tx_x, tx_y, tx_z, avg_rate = compute_rate_from_csv_gz(file_path, noise_power=noise_power, scene_name=scene_name)
-            results.append([tx_x, tx_y, tx_z, avg_rate])
+    worker = partial(_safe_call, compute_rate_from_csv, noise_power=noise_power)
+    with open(output_csv, 'w', newline='') as f, process_pool(num_workers) as executor:
+        writer = csv.writer(f, lineterminator="\n")
+        writer.writerow(["x", "y", "z", "avg_rate"])
+        for idx, (file_path, coord, (avg_rate, error)) in enumerate(zip(files, coords, executor.map(worker, files, chunksize=16)), 1):
+            if error is not None:
+                print(f"\nSkipping {file_path}: {error}")
+                continue
+            writer.writerow([*coord, avg_rate])
+            f.flush()
+            written += 1
             print(f"\rProcessed {idx}/{total}: {os.path.basename(file_path)}", end="", flush=True)
-        except Exception as e:
-            print(f"\nSkipping {file_path}: {e}")
     print("\nAll files processed.")
-    df = pd.DataFrame(results, columns=["x", "y", "z", "avg_rate"])
-    df.to_csv(output_csv, index=False)
-    print(f"Wrote rate data for {len(results)} files to {output_csv}")
-
-def find_closest_rss_file(coord, rm_data_dir, scene_name="munich"): 
-    """
-    Given a coordinate (x, y, z) and a directory containing rss_<scene_name>_<x>,<y>,<z>.csv.gz files,
-    return the path to the file whose name has the closest coordinate.
-    Args:
-        coord (tuple/list): (x, y, z) coordinate
-        rm_data_dir (str): Path to directory containing rss files
-        scene_name (str): Scene name (default: "munich")
-    Returns:
-        str: Path to the closest file
-    """
-    pattern = re.compile(rf"rss_{scene_name}_([\-\d.]+),([\-\d.]+),([\-\d.]+)\.csv\.gz$")
-    min_dist = float('inf')
-    closest_file = None
-    for fname in os.listdir(rm_data_dir):
-        m = pattern.match(fname)
-        if m:
-            file_coord = np.array(list(map(float, m.groups())))
-            dist = np.linalg.norm(np.array(coord) - file_coord)
-            if dist < min_dist:
-                min_dist = dist
-                closest_file = os.path.join(rm_data_dir, fname)
-    return closest_file
+    print(f"Wrote rate data for {written} files to {output_csv}")
 
 def compute_rate_for_closest_coordinate(coord, rm_data_dir, noise_power=NOISE_POWER, scene_name="munich"):
     """
     Given a coordinate and a directory of rss_<scene_name>_<x>,<y>,<z>.csv.gz files,
     find the file with the closest coordinate and compute its average rate.
+    An (M, 3) array of coordinates (e.g. a trajectory) is resolved with a single batched nearest-neighbour query,
+    and each distinct file is only loaded once.
     Args:
-        coord (tuple/list): (x, y, z) coordinate
+        coord (tuple/list/numpy.ndarray): (x, y, z) coordinate, or (M, 3) array of coordinates
         rm_data_dir (str): Path to directory containing rss files
         noise_power (float): Noise power in Watts
         scene_name (str): Scene name (default: "munich")
     Returns:
-        float: avg_rate at the closest coordinate
+        float: avg_rate at the closest coordinate (numpy.ndarray of M rates for an (M, 3) input)
     """
+    if np.ndim(coord) == 2:
+        file_paths = find_closest_rss_files_batch(coord, rm_data_dir, scene_name=scene_name)
+        if file_paths is None:
+            raise FileNotFoundError("No matching RSS file found in directory.")
+        unique_paths, inverse = np.unique(file_paths, return_inverse=True)
+        rates = np.array([compute_rate_from_csv_gz(file_path, noise_power=noise_power, scene_name=scene_name)[-1]
+                          for file_path in unique_paths])
+        return rates[inverse]
     file_path = find_closest_rss_file(coord, rm_data_dir, scene_name=scene_name)
     if file_path is None:
         raise FileNotFoundError("No matching RSS file found in directory.")
     avg_rate = compute_rate_from_csv_gz(file_path, noise_power=noise_power, scene_name=scene_name)[-1]
-    return avg_rate
\ No newline at end of file
+    return avg_rate
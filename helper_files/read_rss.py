@@ -5,10 +5,121 @@ import pandas as pd
 import numpy as np
 import os
 import re
+import json
+from dataclasses import dataclass
+from functools import lru_cache
+from scipy.spatial import cKDTree
+from numpy.lib.format import open_memmap
+
+try:
+    # ISA-L accelerated gzip decompression, noticeably faster than the stdlib zlib binding
+    from isal import igzip as gzip
+    _HAVE_ISAL = True
+except ImportError:
+    import gzip
+    _HAVE_ISAL = False
+
+try:
+    # Multi-threaded C++ CSV reader, much faster than pandas for large numeric grids,
+    # and the Feather columnar format used as a fast sidecar for CSV datasets
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+    import pyarrow.feather as pa_feather
+except ImportError:
+    pa = pa_csv = pa_feather = None
+
+# GPU dataframes/arrays: cuDF parses (gzipped) CSVs on the GPU and CuPy reduces the grids there.
+# Imported by gpu_available() on first use only, so that processes which never take the GPU path
+# (e.g. the process-pool workers) do not pay for the cuDF import and the CUDA driver initialization
+cudf = cp = None
+
+# RSS file names encode the scene and the transmitter position, e.g. rss_munich_625.42,-457.60,20.00.csv.gz
+RSS_NAME_RE = re.compile(r"rss_(?P<scene>.+)_(?P<x>[\-\d.]+),(?P<y>[\-\d.]+),(?P<z>[\-\d.]+)\.(?P<ext>csv\.gz|csv|npy|npz)$")
+# Formats of one transmitter position in order of preference, fastest to load first
+RSS_FORMAT_PREFERENCE = ('npy', 'npz', 'csv', 'csv.gz')
+
+# Quantized storage: RSS in tenths of dB as int16, value = q * scale + offset (dB)
+RSS_DB_SCALE = 0.1
+RSS_QUANTIZED_NODATA = np.iinfo(np.int16).min  # Marks cells without signal (zero linear RSS)
+
+def quantize_rss(rss_array, scale=RSS_DB_SCALE):
+    """
+    Converts an RSS grid in absolute (linear) scale to int16 dB values in steps of `scale` dB.
+    Cells with zero RSS are stored as RSS_QUANTIZED_NODATA.
+    
+    Args:
+        rss_array (numpy.ndarray): RSS values in absolute (linear) scale.
+        scale (float): Quantization step in dB (default: RSS_DB_SCALE).
+        
+    Returns:
+        numpy.ndarray: int16 array of quantized dB values.
+    """
+    with np.errstate(divide='ignore'):
+        rss_db = 10 * np.log10(rss_array)
+    q = np.round(rss_db / scale)
+    q = np.where(np.isfinite(q), np.clip(q, RSS_QUANTIZED_NODATA + 1, np.iinfo(np.int16).max), RSS_QUANTIZED_NODATA)
+    return q.astype(np.int16)
+
+def dequantize_rss(q, scale=RSS_DB_SCALE, offset=0.0):
+    """
+    Inverse of quantize_rss: returns the RSS grid in absolute (linear) scale as float32.
+    """
+    rss_array = np.power(np.float32(10), (q * np.float32(scale) + np.float32(offset)) / np.float32(10))
+    rss_array[q == RSS_QUANTIZED_NODATA] = 0
+    return rss_array
+
+def quantization_sidecar_path(file_path):
+    """
+    Returns the path of the JSON sidecar describing the quantization of a binary RSS file.
+    """
+    return os.path.splitext(file_path)[0] + '.json'
+
+def read_rss_quantization(file_path):
+    """
+    Returns the quantization parameters ({'scale', 'offset'}) of a binary RSS file, or None if it is stored unquantized.
+    The sidecar only describes int16 data: callers must check the dtype of the stored array, since a leftover
+    sidecar can sit next to a float32 file.
+    """
+    if not file_path.endswith(('.npy', '.npz')):
+        return None
+    sidecar = quantization_sidecar_path(file_path)
+    if not os.path.exists(sidecar):
+        return None
+    with open(sidecar) as f:
+        return json.load(f)
+
+def _table_to_array(table):
+    """
+    Stacks the columns of a pyarrow Table (one per grid column) into a 2D float32 array.
+    """
+    rss_array = np.empty((table.num_rows, table.num_columns), dtype=np.float32)
+    for j, column in enumerate(table.columns):
+        rss_array[:, j] = column.to_numpy()
+    return rss_array
+
+def feather_path(csv_file):
+    """
+    Returns the path of the Feather copy of a .csv or .csv.gz RSS file.
+    """
+    base = csv_file[:-len('.gz')] if csv_file.endswith('.gz') else csv_file
+    return os.path.splitext(base)[0] + '.feather'
+
+def fresh_feather_path(csv_file):
+    """
+    Returns the path of the Feather copy of a CSV RSS file if it exists and is not older than the CSV
+    (e.g. the CSV was not regenerated since the conversion), None otherwise.
+    """
+    out_file = feather_path(csv_file)
+    try:
+        if os.path.getmtime(out_file) >= os.path.getmtime(csv_file):
+            return out_file
+    except OSError:
+        pass
+    return None
 
 def read_csv_to_numpy(csv_file):
     """
-    Reads a CSV file and returns its data as a NumPy array.
+    Reads a CSV file (optionally gzipped) and returns its data as a float32 NumPy array.
     
     Args:
         csv_file (str): Path to the CSV file.
@@ -16,35 +127,433 @@ def read_csv_to_numpy(csv_file):
     Returns:
         numpy.ndarray: The array containing CSV data.
     """
-    df = pd.read_csv(csv_file, header=None)
+    if pa_csv is not None:
+        read_options = pa_csv.ReadOptions(autogenerate_column_names=True, use_threads=True)
+        # Parse straight to float32 instead of inferring float64 columns and narrowing them afterwards;
+        # the autogenerated column names are f0, f1, ... and the column count is taken from the first line
+        with (gzip.open(csv_file, 'rb') if csv_file.endswith('.gz') else open(csv_file, 'rb')) as fh:
+            num_columns = fh.readline().count(b',') + 1
+        convert_options = pa_csv.ConvertOptions(column_types={f"f{j}": pa.float32() for j in range(num_columns)})
+        if csv_file.endswith('.gz') and _HAVE_ISAL:
+            # Inflate with ISA-L and let pyarrow parse the decompressed stream
+            with gzip.open(csv_file, 'rb') as fh:
+                table = pa_csv.read_csv(fh, read_options=read_options, convert_options=convert_options)
+        else:
+            # pyarrow decompresses .gz paths itself (zlib)
+            table = pa_csv.read_csv(csv_file, read_options=read_options, convert_options=convert_options)
+        return _table_to_array(table)
+    if csv_file.endswith('.gz'):
+        with gzip.open(csv_file, 'rb') as fh:
+            df = pd.read_csv(fh, header=None, engine='c', dtype=np.float32)
+    else:
+        df = pd.read_csv(csv_file, header=None, engine='c', dtype=np.float32)
     return df.values
 
-def get_available_tx_coordinates_from_dir(dir):
+def load_rss_array(file_path, dequantize=True):
+    """
+    Loads an RSS grid written by rss_write_csv, in any of its storage formats.
+    Binary .npy files are memory-mapped so that only the pages actually used are read, and the
+    memory map is returned as is so that it can be passed to the kernels without a copy.
+    
+    Args:
+        file_path (str): Path to a .npy, .npz, .csv or .csv.gz RSS file. For CSV files, a .feather
+            sibling created by convert_rss_dir_to_feather is read instead when it is not older than the CSV.
+        dequantize (bool): Whether to convert int16 quantized files back to linear scale.
+            If False, quantized files are returned as stored (see read_rss_quantization).
+        
+    Returns:
+        numpy.ndarray: 2D array of RSS values in absolute (linear) scale.
+    """
+    if file_path.endswith('.npy'):
+        rss_array = np.load(file_path, mmap_mode='r')
+    elif file_path.endswith('.npz'):
+        with np.load(file_path) as data:
+            rss_array = data['rss']
+    elif pa_feather is not None and fresh_feather_path(file_path) is not None:
+        # Prefer the Feather copy written by convert_rss_dir_to_feather over parsing the CSV
+        return _table_to_array(pa_feather.read_table(fresh_feather_path(file_path)))
+    else:
+        return read_csv_to_numpy(file_path)
+    quantization = read_rss_quantization(file_path) if dequantize and rss_array.dtype == np.int16 else None
+    if quantization is not None:
+        rss_array = dequantize_rss(rss_array, scale=quantization['scale'], offset=quantization['offset'])
+    return rss_array
+
+@lru_cache(maxsize=None)
+def gpu_available():
+    """
+    Returns whether cuDF/CuPy are installed and a CUDA device is usable, importing them on the first call.
+    """
+    global cudf, cp
+    try:
+        import cudf as _cudf
+        import cupy as _cp
+        if _cp.cuda.runtime.getDeviceCount() == 0:
+            return False
+    except Exception:
+        # Not installed, or installed without a usable CUDA device/driver
+        return False
+    cudf, cp = _cudf, _cp
+    return True
+
+def load_rss_array_gpu(file_path):
+    """
+    Loads an RSS grid into GPU memory. CSV files are parsed on the GPU with cuDF, the other
+    formats are loaded with load_rss_array and copied to the device.
+    
+    Args:
+        file_path (str): Path to a .npy, .npz, .csv or .csv.gz RSS file.
+        
+    Returns:
+        cupy.ndarray: 2D float32 array of RSS values in absolute (linear) scale.
+    """
+    if not gpu_available():
+        raise RuntimeError("cuDF/CuPy with a CUDA device are required to load RSS files on the GPU.")
+    if file_path.endswith('.csv') or file_path.endswith('.csv.gz'):
+        df = cudf.read_csv(file_path, header=None, dtype='float32',
+                           compression='gzip' if file_path.endswith('.gz') else None)
+        return df.to_cupy()
+    return cp.asarray(load_rss_array(file_path), dtype=cp.float32)
+
+def get_available_tx_coordinates_from_dir(dir, scene_name="munich"):
     """
-    Scans the given directory for files named like 'rss_munich_<x>,<y>,<z>.csv.gz' and returns an array of transmitter coordinates (x, y, z) for which coverage files are available.
+    Scans the given directory for files named like 'rss_<scene_name>_<x>,<y>,<z>.{csv,csv.gz,npy,npz}' and returns an array of transmitter coordinates (x, y, z) for which coverage files are available.
     
     Args:
         dir (str): Path to the dataset directory.
+        scene_name (str): Scene name (default: "munich")
         
     Returns:
         np.ndarray: Array of shape (N, 3) with transmitter coordinates for available coverage files.
     """
-    coords = []
-    pattern = re.compile(r"rss_munich_([-\d.]+),([-\d.]+),([-\d.]+)\.csv\.gz$")
-    for fname in os.listdir(dir):
-        match = pattern.match(fname)
-        if match:
-            x, y, z = map(float, match.groups())
-            coords.append([x, y, z])
+    coords = [list(coord) for _, coord in iter_rss_files(dir, scene_name)]
     return np.array(coords)
 
+# Per-scene transmitter bounds of a dataset directory, written by write_dir_bounds
+RSS_BOUNDS_FILE = 'bounds.json'
 
+def write_dir_bounds(dir_path, scene_name="munich"):
+    """
+    Computes the x/y range of the transmitter positions of a dataset directory and stores it in
+    its RSS_BOUNDS_FILE together with the directory mtime, so that plots do not have to scan the
+    directory again until files are added or removed.
+    
+    Args:
+        dir_path (str): Path to the dataset directory.
+        scene_name (str): Scene name (default: "munich")
+        
+    Returns:
+        dict: {'x_min', 'x_max', 'y_min', 'y_max', 'mtime'} of the transmitter positions.
+    """
+    coords = get_available_tx_coordinates_from_dir(dir_path, scene_name=scene_name)
+    if len(coords) == 0:
+        raise ValueError(f"No RSS files for scene '{scene_name}' found in {dir_path}.")
+    bounds = {'x_min': float(coords[:, 0].min()), 'x_max': float(coords[:, 0].max()),
+              'y_min': float(coords[:, 1].min()), 'y_max': float(coords[:, 1].max())}
+    bounds_file = os.path.join(dir_path, RSS_BOUNDS_FILE)
+    all_bounds = {}
+    try:
+        with open(bounds_file) as f:
+            all_bounds = json.load(f)
+    except (OSError, ValueError):
+        pass
+    try:
+        # Create the file before taking the directory mtime, creating it afterwards would change it again
+        open(bounds_file, 'a').close()
+        bounds['mtime'] = os.stat(dir_path).st_mtime
+        all_bounds[scene_name] = bounds
+        with open(bounds_file, 'w') as f:
+            json.dump(all_bounds, f)
+    except OSError as e:
+        print(f"Warning: Could not write {bounds_file}: {e}")
+    return bounds
+
+def read_dir_bounds(dir_path, scene_name="munich"):
+    """
+    Returns the transmitter x/y range of a dataset directory from its RSS_BOUNDS_FILE, recomputing
+    (and storing) it with write_dir_bounds if it is missing or the directory changed since.
+    
+    Args:
+        dir_path (str): Path to the dataset directory.
+        scene_name (str): Scene name (default: "munich")
+        
+    Returns:
+        dict: {'x_min', 'x_max', 'y_min', 'y_max', 'mtime'} of the transmitter positions.
+    """
+    try:
+        with open(os.path.join(dir_path, RSS_BOUNDS_FILE)) as f:
+            bounds = json.load(f)[scene_name]
+        if bounds.get('mtime') == os.stat(dir_path).st_mtime:
+            return bounds
+    except (OSError, KeyError, ValueError, AttributeError):
+        pass
+    return write_dir_bounds(dir_path, scene_name=scene_name)
+
+def load_tx_positions(positions_file):
+    """
+    Loads transmitter positions saved with np.save (.npy), falling back to text files with one x,y,z row per line.
+    
+    Args:
+        positions_file (str): Path to the positions file.
+        
+    Returns:
+        numpy.ndarray: Array of shape (N, 3) with transmitter positions.
+    """
+    try:
+        positions = np.load(positions_file)
+    except ValueError:
+        # Not a .npy file: legacy text file written with np.savetxt
+        try:
+            positions = np.loadtxt(positions_file, delimiter=',')
+        except Exception:
+            # Fall back to whitespace delimiter in case csv isn't comma separated.
+            positions = np.loadtxt(positions_file)
+    return np.atleast_2d(positions)
+
+def parse_tx_coord(filename, scene_name="munich"):
+    """
+    Extracts the transmitter coordinates encoded in an RSS file name.
+
+    Args:
+        filename (str): File name or path, e.g. rss_munich_625.42,-457.60,20.00.csv.gz
+        scene_name (str): Scene name (default: "munich")
+
+    Returns:
+        tuple: (tx_x, tx_y, tx_z)
+    """
+    filename = os.path.basename(filename)
+    m = RSS_NAME_RE.match(filename)
+    if not m or m.group('scene') != scene_name:
+        raise ValueError(f"Filename {filename} does not match expected pattern for scene '{scene_name}'.")
+    return float(m.group('x')), float(m.group('y')), float(m.group('z'))
+
+def iter_rss_files(dir_path, scene_name="munich"):
+    """
+    Iterates over the RSS files of a scene in a directory, one file per transmitter position.
+    A position stored in several formats (e.g. a .csv.gz dataset regenerated with --npy) is yielded once,
+    from the format earliest in RSS_FORMAT_PREFERENCE.
+
+    Args:
+        dir_path (str): Path to directory containing rss files
+        scene_name (str): Scene name (default: "munich")
+
+    Yields:
+        tuple: (file_path, (tx_x, tx_y, tx_z)) for every rss_<scene_name>_<x>,<y>,<z>.{csv,csv.gz,npy,npz} file.
+    """
+    best = {}
+    with os.scandir(dir_path) as entries:
+        for entry in entries:
+            m = RSS_NAME_RE.match(entry.name)
+            if m and m.group('scene') == scene_name:
+                coord = (float(m.group('x')), float(m.group('y')), float(m.group('z')))
+                rank = RSS_FORMAT_PREFERENCE.index(m.group('ext'))
+                if coord not in best or rank < best[coord][0]:
+                    best[coord] = (rank, entry.path)
+    for coord, (_, path) in best.items():
+        yield path, coord
+
+@dataclass
+class _RSSFileIndex:
+    """
+    Nearest-neighbour index over the transmitter coordinates encoded in the RSS file names of a directory.
+    """
+    mtime: float
+    paths: list
+    coords: np.ndarray
+    tree: cKDTree = None
+
+    def nearest(self, coord):
+        """
+        Returns the position in `paths` of the file whose coordinate is closest to coord.
+        Small directories are searched with one vectorized squared-distance pass over the packed (N, 3) coords.
+        """
+        if self.tree is None:
+            diff = self.coords - np.asarray(coord, dtype=np.float64)
+            return int(np.einsum('ij,ij->i', diff, diff).argmin())
+        return int(self.tree.query(np.asarray(coord, dtype=np.float64), k=1)[1])
+
+    def nearest_batch(self, coords):
+        """
+        Returns the positions in `paths` of the closest files for an (M, 3) array of coordinates, in one tree query.
+        """
+        tree = self.tree if self.tree is not None else cKDTree(self.coords)
+        return tree.query(np.atleast_2d(np.asarray(coords, dtype=np.float64)), k=1)[1]
+
+# Below this many files a brute-force vectorized search is cheaper than building a KD-tree
+_KDTREE_MIN_FILES = 64
+# Cache of built indexes keyed by (rm_data_dir, scene_name); rebuilt when the directory mtime changes
+_RSS_FILE_INDEXES = {}
+
+def get_rss_file_index(rm_data_dir, scene_name="munich"):
+    """
+    Returns a cached KD-tree index over the rss_<scene_name>_<x>,<y>,<z>.{csv,csv.gz,npy,npz} files in a directory.
+    The directory is scanned once and only rescanned when its modification time changes.
+
+    Args:
+        rm_data_dir (str): Path to directory containing rss files
+        scene_name (str): Scene name (default: "munich")
+
+    Returns:
+        _RSSFileIndex: Index with parallel `paths` and `coords` (N, 3), or None if no file matches.
+    """
+    key = (os.path.abspath(rm_data_dir), scene_name)
+    mtime = os.stat(rm_data_dir).st_mtime
+    index = _RSS_FILE_INDEXES.get(key)
+    if index is not None and index.mtime == mtime:
+        return index
+
+    paths = []
+    coords = []
+    for path, coord in iter_rss_files(rm_data_dir, scene_name=scene_name):
+        paths.append(path)
+        coords.append(coord)
+    if not paths:
+        _RSS_FILE_INDEXES.pop(key, None)
+        return None
+
+    coords = np.asarray(coords, dtype=np.float64)
+    tree = cKDTree(coords, leafsize=16, balanced_tree=True) if len(paths) >= _KDTREE_MIN_FILES else None
+    index = _RSSFileIndex(mtime=mtime, paths=paths, coords=coords, tree=tree)
+    _RSS_FILE_INDEXES[key] = index
+    return index
+
+
+
+def find_closest_rss_file(coord, rm_data_dir, scene_name="munich"): 
+    """
+    Given a coordinate (x, y, z) and a directory containing rss_<scene_name>_<x>,<y>,<z>.csv.gz files,
+    return the path to the file whose name has the closest coordinate.
+    The directory scan is cached by get_rss_file_index, so repeated queries only cost a nearest-neighbour lookup.
+    Args:
+        coord (tuple/list): (x, y, z) coordinate
+        rm_data_dir (str): Path to directory containing rss files
+        scene_name (str): Scene name (default: "munich")
+    Returns:
+        str: Path to the closest file
+    """
+    index = get_rss_file_index(rm_data_dir, scene_name=scene_name)
+    if index is None:
+        return None
+    return index.paths[index.nearest(coord)]
+
+def find_closest_rss_files_batch(coords_batch, rm_data_dir, scene_name="munich"):
+    """
+    Vectorized find_closest_rss_file: returns the closest file for each of several coordinates.
+    Args:
+        coords_batch (array-like): (M, 3) coordinates
+        rm_data_dir (str): Path to directory containing rss files
+        scene_name (str): Scene name (default: "munich")
+    Returns:
+        numpy.ndarray: (M,) array of paths to the closest files, or None if no file matches
+    """
+    index = get_rss_file_index(rm_data_dir, scene_name=scene_name)
+    if index is None:
+        return None
+    return np.asarray(index.paths)[index.nearest_batch(coords_batch)]
+
+def convert_rss_dir_to_feather(dir_path, scene_name="munich", compression='zstd'):
+    """
+    One-shot conversion of the rss_<scene_name>_*.csv.gz files of a directory to Feather files
+    next to them. load_rss_array picks up the Feather copies automatically afterwards.
+    
+    Args:
+        dir_path (str): Directory containing rss_<scene_name>_*.csv.gz files
+        scene_name (str): Scene name (default: "munich")
+        compression (str): Feather compression, 'zstd' (default), 'lz4' or 'uncompressed'.
+            Uncompressed files are larger but skip the decompression on every read.
+        
+    Returns:
+        int: Number of files converted.
+    """
+    if pa_feather is None:
+        raise ImportError("pyarrow is required to convert RSS files to Feather.")
+    converted = 0
+    for file_path, _ in iter_rss_files(dir_path, scene_name=scene_name):
+        out_file = feather_path(file_path)
+        if not file_path.endswith(('.csv', '.csv.gz')) or fresh_feather_path(file_path) is not None:
+            continue
+        rss_array = read_csv_to_numpy(file_path)
+        table = pa.table({f"f{j}": rss_array[:, j] for j in range(rss_array.shape[1])})
+        pa_feather.write_feather(table, out_file, compression=compression)
+        converted += 1
+    write_dir_bounds(dir_path, scene_name=scene_name)
+    print(f"Converted {converted} RSS files in {dir_path} to Feather.")
+    return converted
+
+def stack_coords_path(stack_file):
+    """
+    Returns the path of the transmitter coordinates file stored next to an RSS stack.
+    
+    Args:
+        stack_file (str): Path to the .npy stack written by build_rss_stack
+        
+    Returns:
+        str: Path of the companion <stack>_coords.npy file.
+    """
+    return os.path.splitext(stack_file)[0] + '_coords.npy'
+
+def build_rss_stack(dir_path, out_file, scene_name="munich"):
+    """
+    Consolidates the RSS files of a directory into a single (N, H, W) float32 .npy stack, so that
+    aggregations open one file and read the grids by index instead of parsing thousands of small files.
+    The transmitter coordinates of each grid are written to stack_coords_path(out_file) as an (N, 3) array.
+    
+    Args:
+        dir_path (str): Directory containing rss_<scene_name>_* files
+        out_file (str): Path of the .npy stack to write
+        scene_name (str): Scene name (default: "munich")
+        
+    Returns:
+        int: Number of RSS grids in the stack.
+    """
+    files = sorted(iter_rss_files(dir_path, scene_name=scene_name))
+    if not files:
+        raise ValueError(f"No RSS files for scene '{scene_name}' found in {dir_path}.")
+    first = load_rss_array(files[0][0])
+    stack = open_memmap(out_file, mode='w+', dtype=np.float32, shape=(len(files),) + first.shape)
+    for idx, (file_path, _) in enumerate(files):
+        rss_array = first if idx == 0 else load_rss_array(file_path)
+        if rss_array.shape != first.shape:
+            raise ValueError(f"{file_path} has shape {rss_array.shape}, expected {first.shape}.")
+        stack[idx] = rss_array
+    stack.flush()
+    del stack
+    np.save(stack_coords_path(out_file), np.array([coord for _, coord in files], dtype=np.float64))
+    print(f"Wrote {len(files)} RSS grids from {dir_path} to {out_file}.")
+    return len(files)
+
+def load_rss_stack(stack_file):
+    """
+    Opens an RSS stack written by build_rss_stack. The grids are memory-mapped, so stack[i] only reads grid i.
+    
+    Args:
+        stack_file (str): Path to the .npy stack
+        
+    Returns:
+        tuple: (stack, coords) with the (N, H, W) grids and the (N, 3) transmitter coordinates.
+    """
+    return np.load(stack_file, mmap_mode='r'), np.load(stack_coords_path(stack_file))
 
 def main():
     parser = argparse.ArgumentParser(description="Read an RSS CSV file into a NumPy array.")
-    parser.add_argument("csv_file", type=str, help="Path to the RSS CSV file.")
+    parser.add_argument("csv_file", type=str, help="Path to the RSS CSV file (a directory with --to_feather/--to_stack).")
+    parser.add_argument("--to_feather", action="store_true",
+                        help="Convert all RSS .csv.gz files of the csv_file directory to Feather instead.")
+    parser.add_argument("--feather_compression", type=str, default="zstd", choices=["zstd", "lz4", "uncompressed"],
+                        help="Compression of the Feather files written with --to_feather (default: zstd)")
+    parser.add_argument("--to_stack", type=str, default=None,
+                        help="Consolidate all RSS files of the csv_file directory into this .npy stack instead.")
+    parser.add_argument("--scene", type=str, default="munich", help='Scene name used with --to_feather/--to_stack (default: "munich")')
     args = parser.parse_args()
 
+    if args.to_stack:
+        build_rss_stack(args.csv_file, args.to_stack, scene_name=args.scene)
+        return
+
+    if args.to_feather:
+        convert_rss_dir_to_feather(args.csv_file, scene_name=args.scene, compression=args.feather_compression)
+        return
+
     data_array = read_csv_to_numpy(args.csv_file)
     print("Loaded array shape:", data_array.shape)
 if __name__ == "__main__":
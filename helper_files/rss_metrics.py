@@ -0,0 +1,236 @@
+import numpy as np
+import os
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from read_rss import RSS_QUANTIZED_NODATA, load_rss_array, load_rss_array_gpu, read_rss_quantization
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+try:
+    import numexpr as ne
+except ImportError:
+    ne = None
+
+# Per-grid coverage and rate metrics, kept free of TensorFlow/Sionna imports so that the
+# spawned process-pool workers of the directory aggregations start quickly
+THRESHOLD = -100  # dBm threshold for coverage calculation
+NOISE_POWER = 1e-10  # Example: -100 dBm ≈ 1e-10 W (set as needed)
+_COVERAGE_BLOCK_BYTES = 1 << 20  # Strip size for the blocked coverage reduction, sized to stay in L2
+_INV_LN2 = np.float32(1.0 / np.log(2.0))
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _coverage_kernel(rss_array, lin_threshold):
+        """
+        Counts the samples of a 2D RSS array above lin_threshold in one compiled pass, parallel over rows.
+        """
+        above_threshold_samples = 0
+        for i in prange(rss_array.shape[0]):
+            row = rss_array[i]
+            for j in range(row.shape[0]):
+                if row[j] > lin_threshold:
+                    above_threshold_samples += 1
+        return above_threshold_samples
+
+def compute_coverage_from_arr(rss_array, threshold_dbm=-100):
+    """
+    Compute coverage from RSS array.
+    Coverage is defined as the ratio of the area where RSS is above the threshold.
+    
+    Args:
+        rss_array (numpy.ndarray): 2D array of RSS values in absolute (linear) scale
+        threshold_dbm (float): RSS threshold for coverage calculation in dBm (default: -100 dBm)
+    
+    Returns:
+        float: Coverage value (ratio of area above threshold)
+    """
+    # 10 * log10(x) is monotonic, so compare against the threshold converted to linear scale
+    # instead of converting every RSS sample to dBm
+    lin_threshold = 10.0 ** (threshold_dbm / 10.0)
+    rss_array = np.asarray(rss_array)
+    if njit is not None and rss_array.ndim == 2 and rss_array.dtype.kind == 'f':
+        above_threshold_samples = _coverage_kernel(rss_array, rss_array.dtype.type(lin_threshold))
+    elif rss_array.ndim < 2 or rss_array.nbytes <= _COVERAGE_BLOCK_BYTES:
+        above_threshold_samples = np.count_nonzero(rss_array > lin_threshold)
+    else:
+        # Reduce large grids in row strips so that the boolean mask of a strip stays in cache
+        # (and memory-mapped files are paged in strip by strip)
+        rows_per_block = max(1, _COVERAGE_BLOCK_BYTES // (rss_array.nbytes // rss_array.shape[0]))
+        above_threshold_samples = 0
+        for start in range(0, rss_array.shape[0], rows_per_block):
+            above_threshold_samples += np.count_nonzero(rss_array[start:start + rows_per_block] > lin_threshold)
+    coverage = above_threshold_samples / rss_array.size
+    
+    return coverage
+
+def compute_coverage_from_arr_cuda(rss_array, threshold_dbm=-100):
+    """
+    GPU variant of compute_coverage_from_arr for CuPy arrays (e.g. from read_rss.load_rss_array_gpu).
+    
+    Args:
+        rss_array (cupy.ndarray): 2D array of RSS values in absolute (linear) scale
+        threshold_dbm (float): RSS threshold for coverage calculation in dBm (default: -100 dBm)
+    
+    Returns:
+        float: Coverage value (ratio of area above threshold)
+    """
+    import cupy as cp
+    lin_threshold = rss_array.dtype.type(10.0 ** (threshold_dbm / 10.0))
+    return int(cp.count_nonzero(rss_array > lin_threshold)) / rss_array.size
+
+def compute_coverage_from_quantized(q_array, threshold_dbm=-100, scale=0.1, offset=0.0):
+    """
+    Compute coverage from an int16 RSS array quantized by read_rss.quantize_rss (dB = q * scale + offset).
+    The threshold is converted to the integer domain once, leaving a pure integer comparison.
+    
+    Args:
+        q_array (numpy.ndarray): 2D int16 array of quantized RSS values
+        threshold_dbm (float): RSS threshold for coverage calculation in dBm (default: -100 dBm)
+        scale (float): Quantization step in dB
+        offset (float): Quantization offset in dB
+    
+    Returns:
+        float: Coverage value (ratio of area above threshold)
+    """
+    # q * scale + offset > threshold  <=>  q > floor((threshold - offset) / scale) for integer q
+    q_threshold = int(np.floor(np.round((threshold_dbm - offset) / scale, 6)))
+    q_array = np.asarray(q_array)
+    above_threshold_samples = np.count_nonzero(q_array > max(q_threshold, RSS_QUANTIZED_NODATA))
+    return above_threshold_samples / q_array.size
+
+def load_and_score(file_path, threshold_dbm=THRESHOLD):
+    """
+    Loads an RSS file (.csv.gz, .npy or .npz, plain or int16 quantized) and computes its coverage.
+    Args:
+        file_path (str): Path to the RSS file
+        threshold_dbm (float): Coverage threshold in dBm (default: global THRESHOLD)
+    Returns:
+        float: Coverage value
+    """
+    rss_array = load_rss_array(file_path, dequantize=False)
+    quantization = read_rss_quantization(file_path) if rss_array.dtype == np.int16 else None
+    if quantization is not None:
+        return compute_coverage_from_quantized(rss_array, threshold_dbm=threshold_dbm, **quantization)
+    return compute_coverage_from_arr(rss_array, threshold_dbm=threshold_dbm)
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _mean_shannon(rss_array, inv_noise_power):
+        """
+        Mean of log2(1 + rss * inv_noise_power) over a 2D array, streamed in one compiled pass without temporaries.
+        """
+        total = 0.0
+        for i in prange(rss_array.shape[0]):
+            for j in range(rss_array.shape[1]):
+                total += np.log2(1.0 + rss_array[i, j] * inv_noise_power)
+        return total / (rss_array.shape[0] * rss_array.shape[1])
+
+def compute_rate_from_arr(rss_array, noise_power=NOISE_POWER):
+    """
+    Compute average rate from RSS array using Shannon capacity formula.
+    Args:
+        rss_array (numpy.ndarray): 2D array of RSS values in absolute (linear) scale (Watts)
+        noise_power (float): Noise power in Watts
+    Returns:
+        float: Average rate (bits/s/Hz) over the grid
+    """
+    rss_array = np.asarray(rss_array)
+    if njit is not None and rss_array.ndim == 2 and rss_array.dtype.kind == 'f' and rss_array.size:
+        return _mean_shannon(rss_array, 1.0 / noise_power)
+    # float32 halves the memory traffic; log1p(x) / ln(2) is accurate for small SNR, unlike log2(1 + x)
+    rss_array = rss_array.astype(np.float32, copy=False)
+    inv_noise_power = np.float32(1.0 / noise_power)
+    if ne is not None:
+        # numexpr fuses the multiply, log1p and scaling into one multi-threaded pass
+        rate = ne.evaluate("log1p(rss * inv_n0) * inv_ln2",
+                           local_dict={'rss': rss_array, 'inv_n0': inv_noise_power, 'inv_ln2': _INV_LN2})
+    else:
+        rate = np.log1p(rss_array * inv_noise_power) * _INV_LN2
+    avg_rate = float(np.mean(rate, dtype=np.float64))
+    return avg_rate
+
+def compute_rate_from_arr_cuda(rss_array, noise_power=NOISE_POWER):
+    """
+    GPU variant of compute_rate_from_arr for CuPy arrays (e.g. from read_rss.load_rss_array_gpu).
+    Args:
+        rss_array (cupy.ndarray): 2D array of RSS values in absolute (linear) scale (Watts)
+        noise_power (float): Noise power in Watts
+    Returns:
+        float: Average rate (bits/s/Hz) over the grid
+    """
+    import cupy as cp
+    rate = cp.log1p(rss_array * rss_array.dtype.type(1.0 / noise_power)) * _INV_LN2
+    return float(cp.mean(rate, dtype=cp.float64))
+
+def compute_rate_from_csv(csv_file, noise_power=NOISE_POWER):
+    """
+    Computes the average rate from a CSV file containing RSS data.
+    Args:
+        csv_file (str): Path to the CSV file.
+        noise_power (float): Noise power in Watts
+    Returns:
+        float: Average rate (bits/s/Hz)
+    """
+    rss_array = load_rss_array(csv_file)
+    return compute_rate_from_arr(rss_array, noise_power=noise_power)
+
+def compute_coverage_from_csv_cuda(csv_file, threshold_dbm=THRESHOLD):
+    """
+    Loads an RSS file onto the GPU with read_rss.load_rss_array_gpu and computes its coverage there.
+    Args:
+        csv_file (str): Path to the RSS file
+        threshold_dbm (float): Coverage threshold in dBm (default: global THRESHOLD)
+    Returns:
+        float: Coverage value
+    """
+    return compute_coverage_from_arr_cuda(load_rss_array_gpu(csv_file), threshold_dbm=threshold_dbm)
+
+def compute_rate_from_csv_cuda(csv_file, noise_power=NOISE_POWER):
+    """
+    Loads an RSS file onto the GPU with read_rss.load_rss_array_gpu and computes its average rate there.
+    Args:
+        csv_file (str): Path to the RSS file
+        noise_power (float): Noise power in Watts
+    Returns:
+        float: Average rate (bits/s/Hz)
+    """
+    return compute_rate_from_arr_cuda(load_rss_array_gpu(csv_file), noise_power=noise_power)
+
+def _init_pool_worker(num_threads):
+    """
+    Process-pool initializer: limits the threads of the parallel Numba/numexpr kernels of a worker, so that
+    the pool does not run cpu_count() threads in each of its cpu_count() processes.
+    """
+    if njit is not None:
+        import numba
+        numba.set_num_threads(num_threads)
+    if ne is not None:
+        ne.set_num_threads(num_threads)
+
+def process_pool(num_workers=None):
+    """
+    Creates the process pool of the directory aggregations. The workers are spawned, not forked:
+    forking after Numba's parallel kernels have run in this process can deadlock.
+    The cores are split between the workers, i.e. each worker runs its kernels with cpu_count() // num_workers threads.
+    Args:
+        num_workers (int): Number of worker processes (default: os.cpu_count())
+    Returns:
+        concurrent.futures.ProcessPoolExecutor: The pool, to be used as a context manager.
+    """
+    num_workers = num_workers or os.cpu_count()
+    return ProcessPoolExecutor(max_workers=num_workers, mp_context=multiprocessing.get_context('spawn'),
+                               initializer=_init_pool_worker, initargs=(max(1, os.cpu_count() // num_workers),))
+
+def _safe_call(fn, file_path, **kwargs):
+    """
+    Process-pool worker of the directory aggregations, e.g. executor.map(partial(_safe_call, fn), files).
+    Returns (fn(file_path, **kwargs), None), or (None, error message) so that a bad file is skipped
+    instead of aborting the pool.
+    """
+    try:
+        return fn(file_path, **kwargs), None
+    except Exception as e:
+        return None, str(e)
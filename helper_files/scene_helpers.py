@@ -1,5 +1,11 @@
+import numpy as np
 from sionna.rt import load_scene, scene
 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
 def get_scene_bounds_x(scene):
     """
     Returns the minimum and maximum x coordinates from the scene's bounding box.
@@ -89,3 +95,38 @@ def grid_indices_to_center_coordinate(indices, x_min, y_min, z_min, cell_size):
     z = z_min + (k + 0.5) * cell_size[2]
     return (x, y, z)
 
+def _coord_to_idx(coord, x_min, y_min, z_min, cx, cy, cz):
+    """
+    Scalar variant of coordinate_to_grid_indices with the cell size passed as plain floats, JIT-compiled
+    with Numba when available so that it can be called per sample from tight loops and other kernels.
+    """
+    return (int((coord[0] - x_min) / cx), int((coord[1] - y_min) / cy), int((coord[2] - z_min) / cz))
+
+# No fastmath here: it may replace the division by a reciprocal multiply and move points on cell boundaries
+coord_to_idx = njit(cache=True)(_coord_to_idx) if njit is not None else _coord_to_idx
+
+def coords_to_idx_batch(coords, x_min, y_min, z_min, cell_size):
+    """
+    Vectorized coordinate_to_grid_indices for many coordinates at once.
+    Args:
+        coords (numpy.ndarray): (N, 3) array of (x, y, z) coordinates
+        x_min, y_min, z_min (float): minimum bounds of the grid
+        cell_size (tuple or list): (cell_size_x, cell_size_y, cell_size_z)
+    Returns:
+        numpy.ndarray: (N, 3) int32 array of (i, j, k) grid indices
+    """
+    mins = np.array([x_min, y_min, z_min], dtype=np.float64)
+    return ((np.asarray(coords, dtype=np.float64) - mins) / np.asarray(cell_size, dtype=np.float64)).astype(np.int32)
+
+def idx_to_center_batch(indices, x_min, y_min, z_min, cell_size):
+    """
+    Vectorized grid_indices_to_center_coordinate for many grid indices at once.
+    Args:
+        indices (numpy.ndarray): (N, 3) array of (i, j, k) grid indices
+        x_min, y_min, z_min (float): minimum bounds of the grid
+        cell_size (tuple or list): (cell_size_x, cell_size_y, cell_size_z)
+    Returns:
+        numpy.ndarray: (N, 3) float64 array of (x, y, z) cell center coordinates
+    """
+    mins = np.array([x_min, y_min, z_min], dtype=np.float64)
+    return mins + (np.asarray(indices, dtype=np.float64) + 0.5) * np.asarray(cell_size, dtype=np.float64)
@@ -0,0 +1,125 @@
+import numpy as np
+import pandas as pd
+import os
+from rss_metrics import THRESHOLD, NOISE_POWER, compute_coverage_from_arr, compute_rate_from_arr, process_pool, _safe_call
+from read_rss import iter_rss_files, load_rss_array
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+STATS_COLUMNS = ["x", "y", "z", "coverage", "avg_rate", "peak_dbm", "p90_dbm"]
+
+if njit is not None:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _fused_stats(rss_array, lin_threshold, inv_noise_power):
+        """
+        Coverage count, Shannon rate sum and peak of a non-empty 2D RSS array in one compiled pass, parallel over rows.
+        """
+        n_rows, n_cols = rss_array.shape
+        row_above = np.zeros(n_rows, dtype=np.int64)
+        row_rate = np.zeros(n_rows)
+        row_peak = np.empty(n_rows)
+        for i in prange(n_rows):
+            above = 0
+            rate = 0.0
+            peak = rss_array[i, 0]
+            for j in range(n_cols):
+                value = rss_array[i, j]
+                if value > lin_threshold:
+                    above += 1
+                rate += np.log2(1.0 + value * inv_noise_power)
+                if value > peak:
+                    peak = value
+            row_above[i] = above
+            row_rate[i] = rate
+            row_peak[i] = peak
+        n_samples = n_rows * n_cols
+        return row_above.sum() / n_samples, row_rate.sum() / n_samples, row_peak.max()
+
+def _to_dbm(value):
+    """
+    Converts a linear RSS value to dBm with the convention of the coverage threshold
+    (threshold_dbm = 10 * log10(linear threshold)), mapping 0 to -inf.
+    """
+    with np.errstate(divide='ignore'):
+        return float(10.0 * np.log10(value))
+
+def compute_stats_from_arr(rss_array, threshold_dbm=THRESHOLD, noise_power=NOISE_POWER):
+    """
+    Computes coverage, average rate, peak and 90th percentile RSS of an RSS array.
+    Coverage, rate and peak come from a single fused pass over the grid when Numba is available.
+    Args:
+        rss_array (numpy.ndarray): 2D array of RSS values in absolute (linear) scale (Watts)
+        threshold_dbm (float): Coverage threshold in dBm (default: global THRESHOLD)
+        noise_power (float): Noise power in Watts
+    Returns:
+        tuple: (coverage, avg_rate, peak_dbm, p90_dbm)
+    """
+    rss_array = np.asarray(rss_array)
+    if njit is not None and rss_array.ndim == 2 and rss_array.dtype.kind == 'f' and rss_array.size:
+        lin_threshold = rss_array.dtype.type(10.0 ** (threshold_dbm / 10.0))
+        coverage, avg_rate, peak = _fused_stats(rss_array, lin_threshold, 1.0 / noise_power)
+    else:
+        coverage = compute_coverage_from_arr(rss_array, threshold_dbm=threshold_dbm)
+        avg_rate = compute_rate_from_arr(rss_array, noise_power=noise_power)
+        peak = np.max(rss_array)
+    # The percentile needs a selection over the whole grid and cannot be fused into the streaming pass
+    p90 = np.percentile(rss_array, 90)
+    return float(coverage), float(avg_rate), _to_dbm(peak), _to_dbm(p90)
+
+def compute_stats_from_csv(csv_file, threshold_dbm=THRESHOLD, noise_power=NOISE_POWER):
+    """
+    Loads an RSS file and computes its stats with compute_stats_from_arr.
+    Args:
+        csv_file (str): Path to the RSS file
+        threshold_dbm (float): Coverage threshold in dBm (default: global THRESHOLD)
+        noise_power (float): Noise power in Watts
+    Returns:
+        tuple: (coverage, avg_rate, peak_dbm, p90_dbm)
+    """
+    return compute_stats_from_arr(load_rss_array(csv_file), threshold_dbm=threshold_dbm, noise_power=noise_power)
+
+def compute_stats_for_directory(dir_path, output_file=None, threshold_dbm=THRESHOLD, noise_power=NOISE_POWER, scene_name="munich", num_workers=None):
+    """
+    For all rss_<scene_name>_*.{csv,csv.gz,npy,npz} files in the directory, compute coverage, average rate,
+    peak and 90th percentile RSS, loading every file only once.
+    Files are processed in parallel with a process pool.
+    Args:
+        dir_path (str): Directory containing rss_<scene_name>_*.{csv,csv.gz,npy,npz} files
+        output_file (str): Optional output path, written as Parquet if it ends with .parquet and as CSV otherwise
+        threshold_dbm (float): Coverage threshold in dBm (default: global THRESHOLD)
+        noise_power (float): Noise power in Watts
+        scene_name (str): Scene name (default: "munich")
+        num_workers (int): Number of worker processes (default: os.cpu_count())
+    Returns:
+        pandas.DataFrame: One row per file with columns x, y, z, coverage, avg_rate, peak_dbm, p90_dbm
+    """
+    from functools import partial
+    files, coords = [], []
+    for file_path, coord in iter_rss_files(dir_path, scene_name=scene_name):
+        files.append(file_path)
+        coords.append(coord)
+    total = len(files)
+    print(f"Found {total} files to process.")
+    results = np.empty((total, len(STATS_COLUMNS)))
+    valid = np.zeros(total, dtype=bool)
+    worker = partial(_safe_call, compute_stats_from_csv, threshold_dbm=threshold_dbm, noise_power=noise_power)
+    with process_pool(num_workers) as executor:
+        for idx, (file_path, coord, (stats, error)) in enumerate(zip(files, coords, executor.map(worker, files, chunksize=32))):
+            if error is not None:
+                print(f"\nSkipping {file_path}: {error}")
+                continue
+            results[idx] = (*coord, *stats)
+            valid[idx] = True
+            print(f"\rProcessed {idx + 1}/{total}: {os.path.basename(file_path)}", end="", flush=True)
+    print("\nAll files processed.")
+    df = pd.DataFrame(results[valid], columns=STATS_COLUMNS)
+    if output_file:
+        if output_file.endswith('.parquet'):
+            df.to_parquet(output_file, index=False)
+        else:
+            df.to_csv(output_file, index=False)
+        print(f"Wrote stats for {len(df)} files to {output_file}")
+    return df